@@ -4,46 +4,52 @@ Check local coverage: how many train images are near each test image.
 """
 
 from pathlib import Path
-import re
+import numpy as np
+from modules import iter_jpgs
 
 
 def extract_frame_number(filename):
     """Extract frame number from filename like 'frame_0132.jpg'."""
-    match = re.search(r'frame_(\d+)', filename)
-    if match:
-        return int(match.group(1))
+    _, sep, rest = filename.partition('frame_')
+    num_digits = len(rest) - len(rest.lstrip('0123456789'))
+    if sep and num_digits:
+        return int(rest[:num_digits])
     return None
 
 
+def frame_numbers(filenames):
+    """Frame numbers of an iterable of 'frame_NNNN.jpg' names as an int array."""
+    return np.fromiter((extract_frame_number(name) for name in filenames), dtype=np.int64)
+
+
 def main():
     map_root = Path('colmap_database/large_map')
     
-    # Get train and test images
-    train_images = sorted(map_root.glob('large_set_train/*.jpg'))
-    test_images = sorted(map_root.glob('large_set_test/*.jpg'))
+    # Extract frame numbers of train and test images
+    train_nums = frame_numbers(iter_jpgs(map_root / 'large_set_train'))
+    test_names = sorted(iter_jpgs(map_root / 'large_set_test'), key=extract_frame_number)
+    test_nums = frame_numbers(test_names)
     
-    # Extract frame numbers
-    train_frames = {extract_frame_number(img.name): img.name for img in train_images}
-    test_frames = {extract_frame_number(img.name): img.name for img in test_images}
-    
-    print(f"Train images: {len(train_frames)}")
-    print(f"Test images: {len(test_frames)}")
-    print(f"\nFrame range: {min(train_frames.keys())} to {max(max(train_frames.keys()), max(test_frames.keys()))}")
+    print(f"Train images: {len(train_nums)}")
+    print(f"Test images: {len(test_nums)}")
+    max_frame = max(train_nums.max(), test_nums.max())
+    print(f"\nFrame range: {train_nums.min()} to {max_frame}")
     
     # Analyze coverage for each test image
     window = 10  # Look ±10 frames around each test image
     
     print(f"\n=== Local Coverage (±{window} frames) ===")
     
+    # Count train images within window of every frame in one convolution
+    present = np.zeros(max_frame + 1, dtype=np.int32)
+    present[train_nums] = 1
+    kernel = np.ones(2 * window + 1, dtype=np.int32)
+    nearby_counts = np.convolve(present, kernel)[window:window + len(present)]
+    
     test_coverage = []
-    for test_num in sorted(test_frames.keys()):
-        # Count train images within window
-        nearby_train = 0
-        for offset in range(-window, window + 1):
-            if test_num + offset in train_frames:
-                nearby_train += 1
-        
-        test_coverage.append((test_num, test_frames[test_num], nearby_train))
+    for test_num, test_name, nearby_train in zip(test_nums.tolist(), test_names,
+                                                 nearby_counts[test_nums].tolist()):
+        test_coverage.append((test_num, test_name, nearby_train))
         print(f"frame_{test_num:04d}.jpg: {nearby_train}/{window*2+1} train images nearby")
     
     # Show statistics
@@ -4,39 +4,10 @@ Example: Using the localisation package programmatically.
 """
 
 import numpy as np
-from scipy.spatial.transform import Rotation
 from modules import MapLoader, Localiser
 
 
 
-def load_colmap_ground_truth(images_txt_path):
-    """Load ground truth camera positions from COLMAP images.txt file."""
-    colmap_poses = {}
-    
-    with open(images_txt_path, 'r') as f:
-        for line in f:
-            if line.startswith('#') or line.strip() == '':
-                continue
-            
-            parts = line.strip().split()
-            
-            # Image line has: IMAGE_ID QW QX QY QZ TX TY TZ CAMERA_ID NAME
-            if len(parts) == 10:
-                qw, qx, qy, qz = float(parts[1]), float(parts[2]), float(parts[3]), float(parts[4])
-                tx, ty, tz = float(parts[5]), float(parts[6]), float(parts[7])
-                img_name = parts[9]
-                
-                # Convert quaternion to rotation matrix
-                R = Rotation.from_quat([qx, qy, qz, qw]).as_matrix()
-                t = np.array([tx, ty, tz])
-                
-                # Camera center: C = -R^T @ t
-                C = -R.T @ t
-                
-                colmap_poses[img_name] = C
-    
-    return colmap_poses
-
 def main():
     map_root = 'colmap_database/large_map/'
     # Load map
@@ -49,7 +20,7 @@ def main():
 
     K = MapLoader.load_camera_intrinsics('colmap_database/figure_8_map/figure8/ground_truth_poses.json')
     
-    gt_positions = load_colmap_ground_truth(map_root +'project_files_large_map/images.txt')
+    gt_positions = MapLoader.load_colmap_ground_truth(map_root +'project_files_large_map/images.txt')
     
     # Initialize localiser
     localiser = Localiser(xyz_world, map_descriptors, K)
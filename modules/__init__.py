@@ -6,6 +6,7 @@ from .matcher import FeatureMatcher
 from .pose_estimator import PoseEstimator
 from .localiser import Localiser
 from .map_builder import MapBuilder
+from .file_utils import iter_jpgs
 
 __version__ = "1.0.0"
 __all__ = [
@@ -15,4 +16,5 @@ __all__ = [
     "PoseEstimator",
     "Localiser",
     "MapBuilder",
+    "iter_jpgs",
 ]
@@ -1,5 +1,10 @@
 """Feature extraction functionality."""
 
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
@@ -10,6 +15,8 @@ class FeatureExtractor:
     def __init__(self):
         """Initialize SIFT extractor."""
         self.sift = cv2.SIFT_create()
+        self._gray_buf = None
+        self._thread_local = threading.local()
     
     def extract(self, image_path):
         """
@@ -23,18 +30,75 @@ class FeatureExtractor:
                 - keypoints: List of cv2.KeyPoint objects
                 - descriptors: N×128 array of SIFT descriptors
         """
-        # Load image
-        img = cv2.imread(image_path)
-        if img is None:
-            raise FileNotFoundError(f"Could not load image: {image_path}")
+        return self.extract_batch([image_path])[0]
+    
+    def extract_batch(self, image_paths, target_size=None):
+        """
+        Extract SIFT features from several images.
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        Each image is decoded (and resized) and run through SIFT on a thread
+        pool, since OpenCV releases the GIL for both; every worker thread
+        uses its own SIFT instance.
         
-        # Detect and compute
-        keypoints, descriptors = self.sift.detectAndCompute(gray, None)
+        Args:
+            image_paths: List of image file paths
+            target_size: Optional tuple (width, height) for resizing
+            
+        Returns:
+            list: (keypoints, descriptors) tuple for each image, in input order
+        """
+        if len(image_paths) == 1:
+            gray = self._load_gray(image_paths[0], target_size)
+            return [self.sift.detectAndCompute(gray, None)]
         
-        return keypoints, descriptors
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(lambda path: self._extract_threaded(path, target_size),
+                                     image_paths))
+    
+    def iter_extract_batch(self, image_paths, target_size=None):
+        """
+        Lazily extract SIFT features from several images on a thread pool.
+        
+        Like extract_batch, but yields each result in input order as soon as
+        it is ready, so callers can work on earlier images while later ones
+        are still being extracted. At most two images per worker thread are
+        in flight or waiting to be consumed, so memory stays bounded however
+        slowly the results are used. An image that fails to load is yielded
+        as the raised exception instead of a (keypoints, descriptors) tuple.
+        
+        Args:
+            image_paths: List of image file paths
+            target_size: Optional tuple (width, height) for resizing
+            
+        Yields:
+            tuple or Exception: (keypoints, descriptors) for each image
+        """
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+        paths = iter(image_paths)
+        pending = deque()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                # Keep a sliding window of submitted images ahead of the consumer
+                for path in paths:
+                    pending.append(executor.submit(self._extract_threaded, path, target_size))
+                    if len(pending) >= 2 * max_workers:
+                        break
+                
+                while pending:
+                    future = pending.popleft()
+                    next_path = next(paths, None)
+                    if next_path is not None:
+                        pending.append(executor.submit(self._extract_threaded,
+                                                       next_path, target_size))
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield e
+            finally:
+                # Consumer stopped early: don't extract images nobody will use
+                for future in pending:
+                    future.cancel()
     
     def extract_from_array(self, img_array):
         """
@@ -46,7 +110,10 @@ class FeatureExtractor:
         Returns:
             tuple: (keypoints, descriptors)
         """
-        gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY)
+        # Reuse the grayscale buffer across frames of the same size
+        if self._gray_buf is None or self._gray_buf.shape != img_array.shape[:2]:
+            self._gray_buf = np.empty(img_array.shape[:2], dtype=np.uint8)
+        gray = cv2.cvtColor(img_array, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
         keypoints, descriptors = self.sift.detectAndCompute(gray, None)
         return keypoints, descriptors
     
@@ -60,10 +127,58 @@ class FeatureExtractor:
         Returns:
             tuple: (keypoints, descriptors)
         """
-        img = cv2.imread(image_path)
+        return self.extract_batch([image_path], target_size)[0]
+    
+    def extract_from_bytes(self, buf, target_size=None):
+        """
+        Extract SIFT features from an encoded image already held in memory.
+        
+        Args:
+            buf: Encoded image bytes (e.g. the contents of a JPEG file)
+            target_size: Optional tuple (width, height) for resizing
+            
+        Returns:
+            tuple: (keypoints, descriptors)
+        """
+        data = np.frombuffer(buf, dtype=np.uint8)
+        img = self._decode_gray(lambda flags: cv2.imdecode(data, flags), target_size)
         if img is None:
-            raise FileNotFoundError(f"Could not load image: {image_path}")  
-        resized_img = cv2.resize(img, target_size)
-        gray = cv2.cvtColor(resized_img, cv2.COLOR_BGR2GRAY)
-        keypoints, descriptors = self.sift.detectAndCompute(gray, None)
-        return keypoints, descriptors
\ No newline at end of file
+            raise ValueError("Could not decode image buffer")
+        return self.sift.detectAndCompute(img, None)
+    
+    def _extract_threaded(self, image_path, target_size=None):
+        """Load and extract one image using the calling thread's SIFT instance."""
+        sift = getattr(self._thread_local, 'sift', None)
+        if sift is None:
+            sift = self._thread_local.sift = cv2.SIFT_create()
+        return sift.detectAndCompute(self._load_gray(image_path, target_size), None)
+    
+    def _load_gray(self, image_path, target_size=None):
+        """Load an image as grayscale, optionally resized to target_size."""
+        img = self._decode_gray(lambda flags: cv2.imread(image_path, flags), target_size)
+        if img is None:
+            raise FileNotFoundError(f"Could not load image: {image_path}")
+        return img
+    
+    @staticmethod
+    def _decode_gray(decode, target_size=None):
+        """
+        Decode an image to grayscale via decode(flags), resizing to target_size.
+        
+        Decoding straight to grayscale skips the BGR decode and conversion.
+        When resizing, the JPEG decoder is first asked for a half-scale image,
+        which it produces inside the IDCT at little cost; the full-size
+        decode is only used if that would be smaller than the target.
+        """
+        if target_size is None:
+            return decode(cv2.IMREAD_GRAYSCALE)
+        
+        img = decode(cv2.IMREAD_REDUCED_GRAYSCALE_2)
+        if img is None or img.shape[1] < target_size[0] or img.shape[0] < target_size[1]:
+            img = decode(cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                return None
+        
+        if (img.shape[1], img.shape[0]) != tuple(target_size):
+            img = cv2.resize(img, target_size)
+        return img
\ No newline at end of file
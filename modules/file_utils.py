@@ -0,0 +1,48 @@
+"""File system helpers."""
+
+import itertools
+import os
+
+
+def iter_jpgs(directory):
+    """
+    Iterate over the names of the JPEG files in a directory.
+    
+    Uses os.scandir, which avoids a stat call and a Path object per entry.
+    
+    Args:
+        directory: Directory to list
+        
+    Returns:
+        generator: File names (not full paths) ending in .jpg
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith('.jpg'):
+                yield entry.name
+
+
+def iter_image_pose_lines(images_txt_path):
+    """
+    Iterate over the pose lines of a COLMAP images.txt file.
+    
+    After the header comments every image takes two lines, its pose line
+    and a (possibly empty) POINTS2D line, so only every other line is read
+    as a pose and the long POINTS2D lines are never split.
+    
+    Args:
+        images_txt_path: Path to images.txt
+        
+    Returns:
+        generator: Split pose lines,
+            [IMAGE_ID, QW, QX, QY, QZ, TX, TY, TZ, CAMERA_ID, NAME]
+    """
+    with open(images_txt_path, 'r') as f:
+        lines = itertools.dropwhile(lambda line: line.startswith('#'), f)
+        for line in itertools.islice(lines, 0, None, 2):
+            parts = line.split(None, 10)
+            if not parts:
+                continue
+            if len(parts) != 10:
+                raise ValueError(f"Malformed image line in {images_txt_path}: {line[:80]!r}")
+            yield parts
@@ -1,10 +1,33 @@
 """Main localisation orchestrator."""
 
+import copy
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import cv2
 import numpy as np
 from .feature_extractor import FeatureExtractor
-from .matcher import FeatureMatcher
+from .matcher import FeatureMatcher, configure_worker, quantize_descriptors
 from .pose_estimator import PoseEstimator
 
+# Localiser inherited by forked localise_batch worker processes
+_worker_localiser = None
+
+
+def _worker_init():
+    """Limit native threading in a worker; parallelism comes from the pool."""
+    # CUDA cannot be used after fork; the inherited Localiser has a CPU index
+    configure_worker()
+    cv2.setNumThreads(1)
+
+
+def _worker_localise(image_path, option, resize_scale):
+    """localise one image in a worker process."""
+    return _worker_localiser.localise(image_path, option=option, resize_scale=resize_scale)
+
 
 class Localiser:
     """
@@ -18,7 +41,8 @@ class Localiser:
                  ratio_threshold=0.75, 
                  reprojection_error=8.0,
                  confidence=0.99,
-                 min_inliers=15):
+                 min_inliers=15,
+                 use_extrinsic_guess=False):
         """
         Initialize localiser with map and camera parameters.
         
@@ -30,20 +54,27 @@ class Localiser:
             reprojection_error: RANSAC reprojection error (pixels)
             confidence: RANSAC confidence level
             min_inliers: Minimum inliers required for valid pose
+            use_extrinsic_guess: Seed PnP with the previous frame's pose
+                (useful when localising a video sequence in order)
         """
-        self.xyz_world = np.array(xyz_world, dtype=np.float32)
-        self.map_descriptors = np.array(map_descriptors, dtype=np.float32)
+        self.xyz_world = np.asarray(xyz_world, dtype=np.float32)
+        self.map_descriptors = quantize_descriptors(map_descriptors)
         self.K = np.array(K, dtype=np.float32)
         
         # Initialize pipeline components
         self.feature_extractor = FeatureExtractor()
         self.matcher = FeatureMatcher(ratio_threshold=ratio_threshold)
+        self.matcher.build_index(self.map_descriptors)
         self.pose_estimator = PoseEstimator(
             reprojection_error=reprojection_error,
             confidence=confidence,
-            min_inliers=min_inliers
+            min_inliers=min_inliers,
+            use_extrinsic_guess=use_extrinsic_guess
         )
         
+        self.pose_estimator.set_camera_matrix(self.K)
+        self._scaled_K = {}
+        
         # Set map bounds for outlier detection
         self.pose_estimator.set_map_bounds(self.xyz_world)
     
@@ -65,67 +96,126 @@ class Localiser:
         try:
             if option == 'array':
                 keypoints, descriptors = self.feature_extractor.extract_from_array(image_path)
-                K_adjusted = self.K
             elif option == 'resize':
                 keypoints, descriptors = self.feature_extractor.resize_and_extract(image_path)
-                # Scale K for resized image
-                K_adjusted = self.K.copy()
-                K_adjusted[0, 0] *= resize_scale  # fx
-                K_adjusted[1, 1] *= resize_scale  # fy
-                K_adjusted[0, 2] *= resize_scale  # cx
-                K_adjusted[1, 2] *= resize_scale  # cy
             else:
                 keypoints, descriptors = self.feature_extractor.extract(image_path)
-                K_adjusted = self.K
         except Exception as e:
             return None, f"Feature extraction failed: {str(e)}"
         
-        if descriptors is None or len(descriptors) < 4:
-            return None, "Not enough features detected in query image"
-        
-        # Match features
-        matched_map_indices, matched_2d_points = self.matcher.match(
-            self.map_descriptors,
-            descriptors,
-            keypoints
-        )
-        
-        if matched_map_indices is None or len(matched_map_indices) < 4:
-            return None, "Not enough feature matches found"
-        
-        # Get corresponding 3D points
-        matched_3d_points = self.xyz_world[matched_map_indices]
-        
-        # Estimate pose with adjusted K
-        pose = self.pose_estimator.estimate_pose(
-            matched_3d_points,
-            matched_2d_points,
-            K_adjusted
-        )
-        
-        if pose is None:
-            return None, "Pose estimation failed (RANSAC or outlier rejection)"
-        
-        return pose, None
+        return self._localise_features(keypoints, descriptors,
+                                       self._camera_matrix(option, resize_scale))
     
-    def localise_batch(self, image_paths, option=None, resize_scale=0.5):
+    def localise_batch(self, image_paths, option=None, resize_scale=0.5, num_workers=1):
         """
         localise multiple images.
         
+        Extraction, matching and pose estimation run as a pipeline: features
+        are extracted on a thread pool, a matching thread consumes them and
+        the calling thread estimates poses, so the stages of consecutive
+        images overlap (OpenCV and FAISS release the GIL). With
+        num_workers > 1 the images are instead spread over a pool of forked
+        worker processes, which share this Localiser's map and matcher index
+        copy-on-write (where fork is unavailable the batch runs in-process).
+        
         Args:
             image_paths: List of image paths
             option: 'array', 'resize', or None
             resize_scale: Scale factor when option='resize'
+            num_workers: Number of worker processes (default 1, no pool)
             
         Returns:
             list: List of (result, error) tuples for each image
         """
+        if (num_workers > 1 and len(image_paths) > 1
+                and 'fork' in multiprocessing.get_all_start_methods()):
+            return self._localise_parallel(image_paths, option, resize_scale, num_workers)
+        
+        if option == 'array' or not image_paths:
+            return [self.localise(path, option=option, resize_scale=resize_scale)
+                    for path in image_paths]
+        
+        target_size = (640, 480) if option == 'resize' else None
+        K_adjusted = self._camera_matrix(option, resize_scale)
+        matches = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        
+        def put(item):
+            """Queue item for pose estimation unless the consumer has stopped."""
+            while not stop.is_set():
+                try:
+                    matches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def match_stage():
+            features = self.feature_extractor.iter_extract_batch(image_paths, target_size)
+            try:
+                for extracted in features:
+                    if isinstance(extracted, Exception):
+                        item = (None, f"Feature extraction failed: {str(extracted)}")
+                    else:
+                        item = self._match_features(*extracted)
+                    if not put(item):
+                        break
+            except BaseException as e:
+                put(e)
+            finally:
+                # Cancels pending extractions and shuts down the thread pool
+                features.close()
+        
+        matcher_thread = threading.Thread(target=match_stage, daemon=True)
+        matcher_thread.start()
+        
         results = []
-        for path in image_paths:
-            result, error = self.localise(path, option=option, resize_scale=resize_scale)
-            results.append((result, error))
+        try:
+            for _ in image_paths:
+                matched = matches.get()
+                if isinstance(matched, BaseException):
+                    raise matched
+                correspondences, error = matched
+                if correspondences is None:
+                    results.append((None, error))
+                else:
+                    results.append(self._estimate_pose(*correspondences, K_adjusted))
+        finally:
+            # Unblock and stop the matching thread, e.g. if pose estimation raised
+            stop.set()
+            while True:
+                try:
+                    matches.get_nowait()
+                except queue.Empty:
+                    break
+            matcher_thread.join()
+        
         return results
     
+    def set_parameters(self, ratio_threshold=None, reprojection_error=None,
+                       confidence=None, min_inliers=None):
+        """
+        Update matching/RANSAC parameters in place.
+        
+        The matcher index is kept, so parameter sweeps can reuse one
+        Localiser instead of rebuilding the index for every combination.
+        Parameters left as None are unchanged.
+        
+        Args:
+            ratio_threshold: Lowe's ratio test threshold
+            reprojection_error: RANSAC reprojection error (pixels)
+            confidence: RANSAC confidence level
+            min_inliers: Minimum inliers required for valid pose
+        """
+        if ratio_threshold is not None:
+            self.matcher.ratio_threshold = ratio_threshold
+        if reprojection_error is not None:
+            self.pose_estimator.reprojection_error = reprojection_error
+        if confidence is not None:
+            self.pose_estimator.confidence = confidence
+        if min_inliers is not None:
+            self.pose_estimator.min_inliers = min_inliers
+    
     def get_map_info(self):
         """Get information about the loaded map."""
         return {
@@ -135,4 +225,79 @@ class Localiser:
                 'min': self.xyz_world.min(axis=0).tolist(),
                 'max': self.xyz_world.max(axis=0).tolist()
             }
-        }
\ No newline at end of file
+        }
+    
+    def _localise_parallel(self, image_paths, option, resize_scale, num_workers):
+        """localise images on forked worker processes sharing this Localiser."""
+        global _worker_localiser
+        
+        # Workers inherit the built map and index through fork instead of
+        # each building their own copy; a GPU index is copied to the CPU
+        # first, since forked children cannot use CUDA
+        _worker_localiser = copy.copy(self)
+        _worker_localiser.matcher = self.matcher.cpu_copy()
+        try:
+            with ProcessPoolExecutor(max_workers=num_workers,
+                                     mp_context=multiprocessing.get_context('fork'),
+                                     initializer=_worker_init) as executor:
+                return list(executor.map(_worker_localise, image_paths,
+                                         repeat(option), repeat(resize_scale),
+                                         chunksize=4))
+        finally:
+            _worker_localiser = None
+    
+    def _camera_matrix(self, option, resize_scale):
+        """Get camera intrinsics, scaled for resized images."""
+        if option != 'resize':
+            return self.K
+        
+        # Scale K for resized image (built once per scale)
+        K_adjusted = self._scaled_K.get(resize_scale)
+        if K_adjusted is None:
+            K_adjusted = self.K.copy()
+            K_adjusted[0, 0] *= resize_scale  # fx
+            K_adjusted[1, 1] *= resize_scale  # fy
+            K_adjusted[0, 2] *= resize_scale  # cx
+            K_adjusted[1, 2] *= resize_scale  # cy
+            self._scaled_K[resize_scale] = K_adjusted
+        return K_adjusted
+    
+    def _localise_features(self, keypoints, descriptors, K_adjusted):
+        """Match extracted query features to the map and estimate pose."""
+        correspondences, error = self._match_features(keypoints, descriptors)
+        if correspondences is None:
+            return None, error
+        return self._estimate_pose(*correspondences, K_adjusted)
+    
+    def _match_features(self, keypoints, descriptors):
+        """Match query features to the map; returns ((3D, 2D points), error)."""
+        if descriptors is None or len(descriptors) < 4:
+            return None, "Not enough features detected in query image"
+        
+        # Match features
+        matched_map_indices, matched_2d_points = self.matcher.match(
+            self.map_descriptors,
+            descriptors,
+            cv2.KeyPoint_convert(keypoints)
+        )
+        
+        if matched_map_indices is None or len(matched_map_indices) < 4:
+            return None, "Not enough feature matches found"
+        
+        # Get corresponding 3D points
+        matched_3d_points = np.take(self.xyz_world, matched_map_indices, axis=0)
+        return (matched_3d_points, matched_2d_points), None
+    
+    def _estimate_pose(self, matched_3d_points, matched_2d_points, K_adjusted):
+        """Estimate pose from 2D-3D correspondences; returns (pose, error)."""
+        # Estimate pose with adjusted K
+        pose = self.pose_estimator.estimate_pose(
+            matched_3d_points,
+            matched_2d_points,
+            K_adjusted
+        )
+        
+        if pose is None:
+            return None, "Pose estimation failed (RANSAC or outlier rejection)"
+        
+        return pose, None
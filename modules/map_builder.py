@@ -1,6 +1,10 @@
+import mmap
+import os
 from pathlib import Path
 import numpy as np
-import pandas as pd
+
+from .file_utils import iter_image_pose_lines, iter_jpgs
+
 
 class MapBuilder:
     """Builds a 3D map and descriptor database from COLMAP outputs."""
@@ -12,103 +16,151 @@ class MapBuilder:
         if not points_3d.exists():
             raise FileNotFoundError(f"{points_3d} not found")
 
-        points = []
-        with open(points_3d, 'r') as f:
-            for line in f:
-                if line.startswith('#') or not line.strip():
-                    continue
-
-                parts = line.strip().split()
-                if len(parts) >= 8:
-                    point_id = int(parts[0])
-                    x, y, z = map(float, parts[1:4])
-                    error = float(parts[7])
-
-                    # Parse (IMAGE_ID, POINT2D_IDX) pairs
-                    track = []
-                    for i in range(8, len(parts), 2):
-                        if i + 1 < len(parts):
-                            img_id = int(parts[i])
-                            kp_idx = int(parts[i+1])
-                            track.append((img_id, kp_idx))
-
-                    points.append({
-                        'id': point_id,
-                        'xyz': np.array([x, y, z]),
-                        'track': track
-                    })
-
-        print(f"Loaded {len(points)} 3D points")
+        points = self.load_points3d(points_3d)
+
+        print(f"Loaded {len(points['ids'])} 3D points")
         return points
 
+    @staticmethod
+    def load_points3d(points3d_path):
+        """
+        Parse a COLMAP points3D.txt file into flat arrays.
+
+        All numeric fields are parsed in a single numpy call. Tracks have a
+        variable length, so they are stored concatenated: the track of point
+        i is track_offsets[i]:track_offsets[i + 1].
+
+        Args:
+            points3d_path: Path to points3D.txt
+
+        Returns:
+            dict: Arrays with keys:
+                - 'ids': (N,) point IDs
+                - 'xyz': N×3 float32 point coordinates
+                - 'error': (N,) reprojection errors
+                - 'track_offsets': (N+1,) int64 offsets into the track arrays
+                - 'track_img_ids': (M,) int32 image ID of each observation
+                - 'track_point2d_idx': (M,) int32 keypoint index of each observation
+        """
+        # Map the file and split it in C; lines stay as bytes, no decoding
+        with open(points3d_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    raw_lines = mm[:].splitlines()
+            else:
+                raw_lines = []
+
+        lines = []
+        for line in raw_lines:
+            line = line.strip()
+            if line and not line.startswith(b'#'):
+                lines.append(line)
+
+        # COLMAP separates fields with single spaces; fromstring accepts any
+        # whitespace run, so count tokens by splitting if the file has others
+        data = b' '.join(lines)
+        if b'  ' in data or b'\t' in data:
+            counts = np.fromiter((len(line.split()) for line in lines),
+                                 dtype=np.int64, count=len(lines))
+        else:
+            counts = np.fromiter((line.count(b' ') + 1 for line in lines),
+                                 dtype=np.int64, count=len(lines))
+        try:
+            values = np.fromstring(data, dtype=np.float64, sep=' ')
+        except ValueError:
+            values = None
+        if values is None or counts.sum() != values.size:
+            raise ValueError(f"Malformed (non-numeric) field in {points3d_path}")
+
+        # Drop malformed lines without the 8 fixed columns
+        line_starts = np.cumsum(counts) - counts
+        valid = counts >= 8
+        line_starts, counts = line_starts[valid], counts[valid]
+
+        # POINT3D_ID, X, Y, Z, R, G, B, ERROR
+        prefix = values[line_starts[:, None] + np.arange(8)]
+
+        # TRACK[] as (IMAGE_ID, POINT2D_IDX) pairs
+        track_lengths = (counts - 8) // 2
+        track_offsets = np.concatenate(([0], np.cumsum(track_lengths)))
+        point_of_obs = np.repeat(np.arange(len(counts)), track_lengths)
+        obs_in_track = np.arange(track_offsets[-1]) - track_offsets[point_of_obs]
+        obs_pos = line_starts[point_of_obs] + 8 + 2 * obs_in_track
+
+        return {
+            'ids': prefix[:, 0].astype(np.int64),
+            'xyz': prefix[:, 1:4].astype(np.float32),
+            'error': prefix[:, 7],
+            'track_offsets': track_offsets,
+            'track_img_ids': values[obs_pos].astype(np.int32),
+            'track_point2d_idx': values[obs_pos + 1].astype(np.int32),
+        }
+
+    @staticmethod
+    def load_images_txt(images_txt_path):
+        """
+        Load the image ID to name mapping from a COLMAP images.txt file.
+
+        Args:
+            images_txt_path: Path to images.txt
+
+        Returns:
+            dict: Image ID -> image name
+        """
+        return {int(parts[0]): parts[9] for parts in iter_image_pose_lines(images_txt_path)}
+
     def load_image_ids_and_descriptors(self, dataset_path, descriptors_path):
         dataset_path = Path(dataset_path)
         descriptors_path = Path(descriptors_path)
 
-        data = []
-        for img_path in sorted(dataset_path.glob("*.jpg")):
-            desc_path = descriptors_path / f"{img_path.name}_desc.txt"
+        descriptors_by_image = {}
+        for img_name in sorted(iter_jpgs(dataset_path)):
+            desc_path = descriptors_path / f"{img_name}_desc.txt"
             if not desc_path.exists():
-                print(f"Warning: Missing descriptor for {img_path.name}")
+                print(f"Warning: Missing descriptor for {img_name}")
                 continue
 
-            descriptors = []
-            with open(desc_path, 'r') as f:
-                for line in f:
-                    if line.strip():
-                        descriptor_array = np.array([int(x) for x in line.split()])
-                        descriptors.append(descriptor_array)
-            
-            data.append({
-                'image': img_path.name,
-                'descriptors': np.array(descriptors)
-            })
-
-        df = pd.DataFrame(data)
-        print(f"Loaded {len(data)} images")
-        return df
+            # SIFT descriptor components are 0-255, so uint8 holds them exactly
+            descriptors = np.loadtxt(desc_path, dtype=np.uint8, ndmin=2)
+
+            descriptors_by_image[img_name] = descriptors
+
+        print(f"Loaded {len(descriptors_by_image)} images")
+        return descriptors_by_image
 
     def build_map_database(self, map_files, dataset_path, descriptors_path, save_to=None):
         points = self.load_map_data(map_files)
-        df = self.load_image_ids_and_descriptors(dataset_path, descriptors_path)
+        descriptors_by_image = self.load_image_ids_and_descriptors(dataset_path, descriptors_path)
         map_path = Path(map_files)
 
-        images_data = {}
-        with open(map_path / "images.txt", 'r') as f:
-            for line in f:
-                if line.startswith('#') or not line.strip():
-                    continue
-
-                parts = line.strip().split()
-                if len(parts) == 10:
-                    img_id = int(parts[0])
-                    img_name = parts[9]
-                    images_data[img_id] = img_name
-
+        images_data = self.load_images_txt(map_path / "images.txt")
         print(f"Loaded {len(images_data)} image mappings")
 
-        map_3d_points, map_descriptors = [], []
-        for point in points:
-            if not point['track']:
-                continue
+        # Use the first observation of each point that has a track
+        offsets = points['track_offsets']
+        has_track = offsets[1:] > offsets[:-1]
+        first_obs = offsets[:-1][has_track]
 
-            first_img_id, first_kp_idx = point['track'][0]
+        map_3d_points, map_descriptors = [], []
+        for xyz, first_img_id, first_kp_idx in zip(
+                points['xyz'][has_track],
+                points['track_img_ids'][first_obs].tolist(),
+                points['track_point2d_idx'][first_obs].tolist()):
             img_name = images_data.get(first_img_id)
 
             if not img_name:
                 continue
 
-            img_row = df[df['image'] == img_name]
-            if img_row.empty:
+            descriptors = descriptors_by_image.get(img_name)
+            if descriptors is None:
                 continue
 
-            descriptors = img_row.iloc[0]['descriptors']
             if first_kp_idx < len(descriptors):
-                map_3d_points.append(point['xyz'])
+                map_3d_points.append(xyz)
                 map_descriptors.append(descriptors[first_kp_idx])
 
         map_3d_points = np.array(map_3d_points, dtype=np.float32)
-        map_descriptors = np.array(map_descriptors, dtype=np.float32)
+        map_descriptors = np.array(map_descriptors, dtype=np.uint8)
 
         print(f"\nBuilt map with {len(map_3d_points)} points")
         print(f"3D points shape: {map_3d_points.shape}")
@@ -120,5 +172,6 @@ class MapBuilder:
         return map_3d_points, map_descriptors
 
     def save_map(self, npz_path, map_3d_points, map_descriptors):
-        np.savez_compressed(npz_path, xyz_world=map_3d_points, descriptors=map_descriptors)
+        # Uncompressed so MapLoader can memory-map the arrays
+        np.savez(npz_path, xyz_world=map_3d_points, descriptors=map_descriptors)
         print(f"Saved map to {npz_path}")
@@ -1,7 +1,126 @@
 """Map loading functionality."""
 
 import numpy as np
+import functools
 import json
+import os
+import struct
+import zipfile
+from .file_utils import iter_image_pose_lines
+from .matcher import quantize_descriptors
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+
+def _read_npz_array(npz_path, name):
+    """
+    Read one array from an NPZ file, memory-mapping it if stored uncompressed.
+    
+    np.load ignores mmap_mode for NPZ archives, so uncompressed members are
+    located inside the zip and mapped directly.
+    
+    Args:
+        npz_path: Path to .npz file
+        name: Name of the array in the archive
+        
+    Returns:
+        np.ndarray: Read-only memory map, or a loaded array if compressed
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        info = zf.getinfo(f"{name}.npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            with zf.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle=False)
+    
+    with open(npz_path, 'rb') as f:
+        # Skip the zip local file header to reach the .npy payload
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_len, extra_len = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    
+    if dtype.hasobject:
+        raise ValueError(f"Cannot memory-map object array '{name}'")
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    
+    return np.memmap(npz_path, dtype=dtype, mode='r', offset=offset,
+                     shape=shape, order='F' if fortran_order else 'C')
+
+
+def _as_aligned(array, dtype, alignment=64):
+    """
+    Return array as C-contiguous dtype data starting on an alignment boundary.
+    
+    Memory maps that need no conversion (and are at least aligned for their
+    dtype) are returned unchanged so they stay zero-copy; anything else is
+    copied into a cache-line aligned buffer if it is not aligned already.
+    """
+    if (isinstance(array, np.memmap) and array.dtype == dtype
+            and array.flags.c_contiguous and array.flags.aligned):
+        return array
+    
+    array = np.ascontiguousarray(array, dtype=dtype)
+    if array.ctypes.data % alignment == 0:
+        return array
+    
+    buf = np.empty(array.nbytes + alignment, dtype=np.uint8)
+    start = -buf.ctypes.data % alignment
+    aligned = buf[start:start + array.nbytes].view(array.dtype).reshape(array.shape)
+    aligned[...] = array
+    return aligned
+
+
+@functools.lru_cache(maxsize=4)
+def _load_map_cached(map_path, mtime_ns, size):
+    """
+    Load and validate a map; cached per file path and modification stamp.
+    
+    The returned arrays are shared between callers, so they are read-only.
+    """
+    xyz_world = _read_npz_array(map_path, 'xyz_world')
+    descriptors = _read_npz_array(map_path, 'descriptors')
+    if descriptors.dtype != np.uint8:
+        descriptors = quantize_descriptors(descriptors)
+    
+    if len(xyz_world) != len(descriptors):
+        raise ValueError("Mismatch between number of 3D points and descriptors")
+    
+    # Same row order in both arrays; float32 points as the Localiser uses them
+    xyz_world = _as_aligned(xyz_world, np.float32)
+    descriptors = _as_aligned(descriptors, np.uint8)
+    
+    xyz_world.flags.writeable = False
+    descriptors.flags.writeable = False
+    return xyz_world, descriptors
+
+
+@functools.lru_cache(maxsize=8)
+def _load_intrinsics_cached(json_path, mtime_ns, size):
+    """Parse K from a ground truth JSON file; cached like _load_map_cached."""
+    with open(json_path, 'rb') as f:
+        data = f.read()
+    gt = orjson.loads(data) if orjson is not None else json.loads(data)
+    
+    ci = gt["camera_intrinsics"]
+    K = np.array([
+        [ci["fx"], 0, ci["cx"]],
+        [0, ci["fy"], ci["cy"]],
+        [0, 0, 1]
+    ], dtype=np.float32)
+    
+    K.flags.writeable = False
+    return K
 
 
 class MapLoader:
@@ -12,45 +131,89 @@ class MapLoader:
         """
         Load 3D map with descriptors from NPZ file.
         
+        Arrays saved uncompressed (as MapBuilder.save_map does) are
+        memory-mapped, so pages are only read from disk when touched.
+        Descriptors stored as float (older maps) are converted to uint8.
+        Loaded maps are cached, so loading the same unchanged file again
+        returns the same read-only arrays without touching the disk.
+        
         Args:
             map_path: Path to .npz file containing xyz_world and descriptors
             
         Returns:
             tuple: (xyz_world, descriptors) where:
                 - xyz_world: N×3 array of 3D point coordinates
-                - descriptors: N×128 array of SIFT descriptors
+                - descriptors: N×128 uint8 array of SIFT descriptors
         """
-        data = np.load(map_path)
-        xyz_world = data['xyz_world']
-        descriptors = data['descriptors']
-        
-        if len(xyz_world) != len(descriptors):
-            raise ValueError("Mismatch between number of 3D points and descriptors")
-            
-        return xyz_world, descriptors
+        map_path = os.path.abspath(map_path)
+        stat = os.stat(map_path)
+        return _load_map_cached(map_path, stat.st_mtime_ns, stat.st_size)
     
     @staticmethod
     def load_camera_intrinsics(json_path):
         """
         Load camera intrinsics from ground truth JSON file.
         
+        Parsed once per unchanged file (with orjson if installed); the
+        returned matrix is shared and read-only.
+        
         Args:
             json_path: Path to JSON file with camera_intrinsics
             
         Returns:
             np.ndarray: 3×3 camera intrinsics matrix K
         """
-        with open(json_path, 'r') as f:
-            gt = json.load(f)
+        json_path = os.path.abspath(json_path)
+        stat = os.stat(json_path)
+        return _load_intrinsics_cached(json_path, stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def load_colmap_ground_truth(images_txt_path):
+        """
+        Load ground truth camera positions from COLMAP images.txt file.
         
-        ci = gt["camera_intrinsics"]
-        K = np.array([
-            [ci["fx"], 0, ci["cx"]],
-            [0, ci["fy"], ci["cy"]],
-            [0, 0, 1]
-        ], dtype=np.float32)
+        All poses are parsed first and the quaternion to rotation matrix
+        conversion is done for every image at once with array arithmetic.
+        
+        Args:
+            images_txt_path: Path to COLMAP images.txt
+            
+        Returns:
+            dict: Image name -> camera center C = -R^T @ t (3-vector)
+        """
+        names, poses = [], []
+        for parts in iter_image_pose_lines(images_txt_path):
+            names.append(parts[9])
+            poses.append(parts[1:8])
+        
+        if not names:
+            return {}
+        
+        poses = np.array(poses, dtype=np.float64)
+        quats, t = poses[:, :4], poses[:, 4:]
+        
+        # COLMAP stores unit quaternions as (w, x, y, z); renormalise for safety
+        quats = quats / np.linalg.norm(quats, axis=1, keepdims=True)
+        w, x, y, z = quats.T
+        xx, yy, zz = x * x, y * y, z * z
+        xy, xz, yz = x * y, x * z, y * z
+        wx, wy, wz = w * x, w * y, w * z
+        
+        R = np.empty((len(quats), 3, 3))
+        R[:, 0, 0] = 1 - 2 * (yy + zz)
+        R[:, 0, 1] = 2 * (xy - wz)
+        R[:, 0, 2] = 2 * (xz + wy)
+        R[:, 1, 0] = 2 * (xy + wz)
+        R[:, 1, 1] = 1 - 2 * (xx + zz)
+        R[:, 1, 2] = 2 * (yz - wx)
+        R[:, 2, 0] = 2 * (xz - wy)
+        R[:, 2, 1] = 2 * (yz + wx)
+        R[:, 2, 2] = 1 - 2 * (xx + yy)
+        
+        # Camera centers: C = -R^T @ t for every image
+        C = -np.einsum('nji,nj->ni', R, t)
         
-        return K
+        return dict(zip(names, C))
     
     @staticmethod
     def get_default_intrinsics():
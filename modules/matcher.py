@@ -1,8 +1,72 @@
 """Feature matching functionality."""
 
+import copy
+
 import cv2
 import numpy as np
 
+try:
+    import faiss
+except ImportError:  # FAISS is optional; fall back to OpenCV brute force
+    faiss = None
+
+# Maps at least this large get an approximate IVF-PQ index instead of an
+# exact flat one
+IVFPQ_MIN_DESCRIPTORS = 200_000
+
+# Shared FAISS GPU resources, created on first use
+_gpu_resources = None
+_gpu_enabled = True
+
+
+def configure_worker():
+    """
+    Prepare matching in a worker process forked for parallel localisation.
+    
+    Keeps the process off the GPU (a forked child must not call into CUDA
+    the parent already initialised) and limits FAISS to one OpenMP thread,
+    since parallelism comes from the process pool. Inherited GPU objects
+    are deliberately left referenced: releasing them would run CUDA
+    teardown in the child.
+    """
+    global _gpu_enabled
+    _gpu_enabled = False
+    if faiss is not None:
+        faiss.omp_set_num_threads(1)
+
+
+def _faiss_gpu_resources():
+    """Return FAISS GPU resources, or None without a GPU-enabled FAISS build."""
+    global _gpu_resources
+    if not _gpu_enabled:
+        return None
+    if faiss is None or not hasattr(faiss, 'StandardGpuResources'):
+        return None
+    if faiss.get_num_gpus() == 0:
+        return None
+    if _gpu_resources is None:
+        _gpu_resources = faiss.StandardGpuResources()
+    return _gpu_resources
+
+
+def quantize_descriptors(descriptors):
+    """
+    Convert SIFT descriptors to a contiguous uint8 array.
+    
+    SIFT descriptor components are integers in 0-255 (OpenCV returns them as
+    float32), so this is lossless and quarters the memory of float32.
+    
+    Args:
+        descriptors: N×128 array of SIFT descriptors
+        
+    Returns:
+        np.ndarray: N×128 uint8 array (the input itself if already uint8)
+    """
+    descriptors = np.asarray(descriptors)
+    if descriptors.dtype != np.uint8:
+        descriptors = np.clip(np.rint(descriptors), 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(descriptors)
+
 
 class FeatureMatcher:
     """Matches features between query image and map."""
@@ -14,57 +78,134 @@ class FeatureMatcher:
         Args:
             ratio_threshold: Lowe's ratio test threshold (default: 0.75)
         """
-        self.matcher = cv2.BFMatcher()
         self.ratio_threshold = ratio_threshold
+        self.index = None
+        self._indexed_descriptors = None
     
-    def match(self, map_descriptors, query_descriptors, query_keypoints):
+    def build_index(self, map_descriptors):
+        """
+        Build the nearest-neighbour index over the map descriptors.
+        
+        With FAISS installed this is an exact flat index storing one byte per
+        component (QT_8bit_direct, lossless for SIFT), or an IVF-PQ index
+        trained on the map itself once the map reaches IVFPQ_MIN_DESCRIPTORS.
+        If FAISS has a GPU available, the search runs there instead: the flat
+        index as a float16 GpuIndexFlatL2 (still exact, as SIFT components
+        are small integers), the IVF-PQ index copied to the device.
+        Without FAISS the descriptors are kept as uint8 for exact OpenCV
+        brute-force search.
+        
+        Args:
+            map_descriptors: N×128 array of map SIFT descriptors
+        """
+        if faiss is not None:
+            descriptors = np.ascontiguousarray(map_descriptors, dtype=np.float32)
+            dim = descriptors.shape[1]
+            gpu = _faiss_gpu_resources()
+            if len(descriptors) >= IVFPQ_MIN_DESCRIPTORS:
+                self.index = faiss.index_factory(dim, "IVF1024,PQ16")
+                self.index.train(descriptors)
+                self.index.nprobe = 16
+                if gpu is not None:
+                    self.index = faiss.index_cpu_to_gpu(gpu, 0, self.index)
+            elif gpu is not None:
+                config = faiss.GpuIndexFlatConfig()
+                config.useFloat16 = True
+                self.index = faiss.GpuIndexFlatL2(gpu, dim, config)
+            else:
+                self.index = faiss.IndexScalarQuantizer(
+                    dim, faiss.ScalarQuantizer.QT_8bit_direct, faiss.METRIC_L2
+                )
+            self.index.add(descriptors)
+        else:
+            self.index = quantize_descriptors(map_descriptors)
+        
+        self._indexed_descriptors = map_descriptors
+    
+    def cpu_copy(self):
+        """
+        Return a matcher sharing this one's index, copied to the CPU if it
+        lives on the GPU, for use in forked worker processes.
+        
+        Returns:
+            FeatureMatcher: Shallow copy with a CPU index
+        """
+        matcher = copy.copy(self)
+        if self._index_on_gpu():
+            matcher.index = faiss.index_gpu_to_cpu(self.index)
+        return matcher
+    
+    def match(self, map_descriptors, query_descriptors, query_keypoints_xy):
         """
         Match query descriptors to map descriptors.
         
         Args:
             map_descriptors: N×128 array of map SIFT descriptors
             query_descriptors: M×128 array of query SIFT descriptors
-            query_keypoints: List of query cv2.KeyPoint objects
+            query_keypoints_xy: M×2 float32 array of query keypoint
+                coordinates (e.g. from cv2.KeyPoint_convert)
             
         Returns:
             tuple: (matched_3d_indices, matched_2d_points) where:
-                - matched_3d_indices: List of map point indices
+                - matched_3d_indices: Array of map point indices
                 - matched_2d_points: N×2 array of corresponding 2D points
         """
-        # KNN match
-        matches = self.matcher.knnMatch(map_descriptors, query_descriptors, k=2)
+        if self.index is None or map_descriptors is not self._indexed_descriptors:
+            self.build_index(map_descriptors)
         
-        # Ratio test
-        good_matches = []
-        for m, n in matches:
-            if m.distance < self.ratio_threshold * n.distance:
-                good_matches.append(m)
+        # Two nearest map descriptors for each query descriptor
+        distances, indices = self._knn(query_descriptors)
         
-        if len(good_matches) < 4:
+        # Ratio test (on squared distances)
+        good = distances[:, 0] < (self.ratio_threshold ** 2) * distances[:, 1]
+        good_query_indices = np.flatnonzero(good)
+        
+        if len(good_query_indices) < 4:
             return None, None
         
-        # Keep only best match per query keypoint (avoid duplicates)
-        query_to_map = {}
-        for match in good_matches:
-            query_idx = match.trainIdx
-            map_idx = match.queryIdx
-            distance = match.distance
-            
-            if query_idx not in query_to_map or distance < query_to_map[query_idx][1]:
-                query_to_map[query_idx] = (map_idx, distance)
+        # Keep only best match per map point (avoid duplicates): sort by map
+        # index, then distance, and take the first of each map index run.
+        # Both go into one int64 key: squared SIFT distances are < 2**24, so
+        # exact in float32, and non-negative float32 bits order like ints
+        good_map_indices = indices[good_query_indices, 0].astype(np.int64)
+        good_distances = distances[good_query_indices, 0].astype(np.float32)
+        keys = (good_map_indices << 32) | good_distances.view(np.int32)
+        order = np.argsort(keys, kind='stable')
+        sorted_map_indices = good_map_indices[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_map_indices[1:] != sorted_map_indices[:-1]
+        keep = np.sort(order[first])
         
         # Extract indices and points
-        matched_map_indices = []
-        matched_2d_points = []
-        
-        for query_idx, (map_idx, _) in query_to_map.items():
-            matched_map_indices.append(map_idx)
-            matched_2d_points.append(query_keypoints[query_idx].pt)
-        
-        return matched_map_indices, np.array(matched_2d_points, dtype=np.float32)
+        matched_query_indices = good_query_indices[keep]
+        return good_map_indices[keep], query_keypoints_xy[matched_query_indices]
     
     def get_statistics(self):
         """Get matching statistics (for debugging)."""
         return {
-            'ratio_threshold': self.ratio_threshold
-        }
\ No newline at end of file
+            'ratio_threshold': self.ratio_threshold,
+            'backend': self._backend()
+        }
+    
+    def _index_on_gpu(self):
+        """Whether the current index is a FAISS GPU index."""
+        return (faiss is not None and hasattr(faiss, 'GpuIndex')
+                and isinstance(self.index, faiss.GpuIndex))
+    
+    def _backend(self):
+        """Name of the nearest-neighbour backend in use."""
+        if faiss is None:
+            return 'opencv'
+        return 'faiss-gpu' if self._index_on_gpu() else 'faiss'
+    
+    def _knn(self, query_descriptors):
+        """Find the two nearest map descriptors (squared L2) of each query descriptor."""
+        # Queries go through the same uint8 rounding as the map, which also
+        # keeps them in range for the 8-bit FAISS index
+        query = quantize_descriptors(query_descriptors)
+        if faiss is not None:
+            return self.index.search(query.astype(np.float32), 2)
+        
+        # OpenCV has a SIMD path for uint8 squared L2 with int32 output
+        return cv2.batchDistance(query, self.index, cv2.CV_32S,
+                                 normType=cv2.NORM_L2SQR, K=2)
\ No newline at end of file
@@ -8,7 +8,8 @@ class PoseEstimator:
     """Estimates camera pose using PnP with RANSAC."""
     
     def __init__(self, reprojection_error=8.0, confidence=0.99, 
-                 min_inliers=15, max_position_deviation=10.0):
+                 min_inliers=15, max_position_deviation=10.0,
+                 use_extrinsic_guess=False):
         """
         Initialize pose estimator.
         
@@ -17,13 +18,19 @@ class PoseEstimator:
             confidence: RANSAC confidence level (0-1)
             min_inliers: Minimum number of inliers required
             max_position_deviation: Maximum allowed distance from map center (meters)
+            use_extrinsic_guess: Seed PnP with the previous successful pose
+                (for sequential frames)
         """
         self.reprojection_error = reprojection_error
         self.confidence = confidence
         self.min_inliers = min_inliers
         self.max_position_deviation = max_position_deviation
-        self.dist_coeffs = np.zeros(5, dtype=np.float32)
+        self.dist_coeffs = np.zeros((1, 5), dtype=np.float32)
+        self._K = None
         self.map_center = None
+        self.use_extrinsic_guess = use_extrinsic_guess
+        self.prev_rvec = None
+        self.prev_tvec = None
     
     def set_map_bounds(self, xyz_world):
         """
@@ -36,14 +43,28 @@ class PoseEstimator:
         map_extent = np.max(np.linalg.norm(xyz_world - self.map_center, axis=1))
         self.max_position_deviation = map_extent + 5.0  # Map extent + buffer
     
-    def estimate_pose(self, points_3d, points_2d, K):
+    def set_camera_matrix(self, K):
+        """
+        Set the default camera intrinsics used by estimate_pose.
+        
+        A private writable copy is kept: the USAC solvePnPRansac overload
+        takes the camera matrix as an in/out argument, which rejects
+        read-only arrays such as the shared one from MapLoader.
+        
+        Args:
+            K: 3×3 camera intrinsics matrix
+        """
+        self._K = np.array(K, dtype=np.float32)
+    
+    def estimate_pose(self, points_3d, points_2d, K=None):
         """
         Estimate camera pose from 2D-3D correspondences.
         
         Args:
             points_3d: N×3 array of 3D world points
             points_2d: N×2 array of corresponding 2D image points
-            K: 3×3 camera intrinsics matrix
+            K: 3×3 camera intrinsics matrix (default: the one from
+                set_camera_matrix)
             
         Returns:
             dict or None: Camera pose information containing:
@@ -57,19 +78,44 @@ class PoseEstimator:
         if len(points_3d) < 4 or len(points_2d) < 4:
             return None
         
-        points_3d = np.array(points_3d, dtype=np.float32)
-        points_2d = np.array(points_2d, dtype=np.float32)
-        K = np.array(K, dtype=np.float32)
+        # No copies when the caller already passes contiguous float32 arrays
+        points_3d = np.ascontiguousarray(points_3d, dtype=np.float32)
+        points_2d = np.ascontiguousarray(points_2d, dtype=np.float32)
+        if K is None:
+            if self._K is None:
+                raise ValueError("No camera matrix given or set")
+            K = self._K
+        else:
+            K = np.ascontiguousarray(K, dtype=np.float32)
+            if not K.flags.writeable:
+                K = K.copy()
+        
+        if self.use_extrinsic_guess and self.prev_rvec is not None:
+            # Start iterative PnP from the previous frame's pose when tracking
+            success, rvec, tvec, inliers = cv2.solvePnPRansac(
+                points_3d,
+                points_2d,
+                K,
+                self.dist_coeffs,
+                rvec=self.prev_rvec.copy(),
+                tvec=self.prev_tvec.copy(),
+                useExtrinsicGuess=True,
+                reprojectionError=self.reprojection_error,
+                confidence=self.confidence,
+                flags=cv2.SOLVEPNP_ITERATIVE
+            )
+        else:
+            # Solve PnP with USAC (MAGSAC scoring, adaptive iteration count)
+            success, _, rvec, tvec, inliers = cv2.solvePnPRansac(
+                points_3d,
+                points_2d,
+                K,
+                self.dist_coeffs,
+                params=self._usac_params()
+            )
         
-        # Solve PnP with RANSAC
-        success, rvec, tvec, inliers = cv2.solvePnPRansac(
-            points_3d,
-            points_2d,
-            K,
-            self.dist_coeffs,
-            reprojectionError=self.reprojection_error,
-            confidence=self.confidence
-        )
+        # Drop the guess on failure so a lost frame does not seed the next one
+        self.prev_rvec = self.prev_tvec = None
         
         if not success or inliers is None:
             return None
@@ -89,6 +135,8 @@ class PoseEstimator:
             if distance_from_center > self.max_position_deviation:
                 return None
         
+        self.prev_rvec, self.prev_tvec = rvec, tvec
+        
         return {
             'position': C,
             'rotation': R,
@@ -97,11 +145,21 @@ class PoseEstimator:
             'total': len(points_3d)
         }
     
+    def _usac_params(self):
+        """USAC settings for the current threshold and confidence."""
+        params = cv2.UsacParams()
+        params.threshold = self.reprojection_error
+        params.confidence = self.confidence
+        params.sampler = cv2.SAMPLING_UNIFORM
+        params.score = cv2.SCORE_METHOD_MAGSAC
+        return params
+    
     def get_configuration(self):
         """Get current estimator configuration."""
         return {
             'reprojection_error': self.reprojection_error,
             'confidence': self.confidence,
             'min_inliers': self.min_inliers,
-            'max_position_deviation': self.max_position_deviation
+            'max_position_deviation': self.max_position_deviation,
+            'use_extrinsic_guess': self.use_extrinsic_guess
         }
\ No newline at end of file
@@ -29,14 +29,14 @@ def rename_images_sequentially(folder_path, dry_run=True):
         print(f"Error: '{folder_path}' is not a directory")
         return
     
-    # Get all image files
-    image_files = []
-    for file in folder.iterdir():
-        if file.is_file() and file.suffix.lower() in image_extensions:
-            image_files.append(file)
-    
-    # Sort files by name to ensure consistent ordering
-    image_files.sort(key=lambda x: x.name)
+    # Get all image files, sorted by name to ensure consistent ordering
+    # (scandir entries cache the file type, so no extra stat per file)
+    with os.scandir(folder) as it:
+        image_files = sorted(
+            (entry for entry in it
+             if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_extensions),
+            key=lambda entry: entry.name
+        )
     
     if not image_files:
         print(f"No image files found in '{folder_path}'")
@@ -51,14 +51,14 @@ def rename_images_sequentially(folder_path, dry_run=True):
     num_digits = max(4, num_digits)
     
     # Keep track of the file extension from the first file (or use .jpg as default)
-    default_extension = image_files[0].suffix if image_files else '.jpg'
+    default_extension = os.path.splitext(image_files[0].name)[1] if image_files else '.jpg'
     
     # Rename files
     rename_pairs = []
-    for idx, old_path in enumerate(image_files, start=1):
-        new_name = f"frame_{idx:0{num_digits}d}{old_path.suffix}"
+    for idx, entry in enumerate(image_files, start=1):
+        new_name = f"frame_{idx:0{num_digits}d}{os.path.splitext(entry.name)[1]}"
         new_path = folder / new_name
-        rename_pairs.append((old_path, new_path))
+        rename_pairs.append((Path(entry.path), new_path))
     
     # Check for conflicts
     conflicts = []
@@ -81,6 +81,14 @@ def rename_images_sequentially(folder_path, dry_run=True):
         print("-" * 80)
         print(f"\nTotal files to rename: {len(rename_pairs)}")
         print("\nTo actually rename the files, run with --execute flag")
+    elif not conflicts:
+        # No target name is taken by another file, so rename directly
+        print("Renaming files...")
+        for old_path, new_path in rename_pairs:
+            os.rename(old_path, new_path)
+            print(f"✓ {new_path.name}")
+        
+        print(f"\n✓ Successfully renamed {len(rename_pairs)} files!")
     else:
         # Use temporary names to avoid conflicts during renaming
         temp_pairs = []
@@ -90,12 +98,12 @@ def rename_images_sequentially(folder_path, dry_run=True):
         for old_path, new_path in rename_pairs:
             temp_name = f"_temp_{old_path.name}"
             temp_path = folder / temp_name
-            old_path.rename(temp_path)
+            os.rename(old_path, temp_path)
             temp_pairs.append((temp_path, new_path))
         
         # Second pass: rename to final names
         for temp_path, new_path in temp_pairs:
-            temp_path.rename(new_path)
+            os.rename(temp_path, new_path)
             print(f"✓ {new_path.name}")
         
         print(f"\n✓ Successfully renamed {len(rename_pairs)} files!")
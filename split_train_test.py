@@ -4,12 +4,22 @@ Script to split images into train and test folders.
 Usage: python split_train_test.py <source_folder> <num_test_images>
 """
 
+import errno
 import os
 import sys
 import shutil
 from pathlib import Path
 import random
 
+def move_file(src, dest):
+    """Move a file with a single rename, copying only across filesystems."""
+    try:
+        os.rename(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dest)
+
 def split_train_test(source_folder, num_test_images, dry_run=True, random_split=False, seed=42):
     """
     Split images from source folder into train and test subfolders.
@@ -34,14 +44,14 @@ def split_train_test(source_folder, num_test_images, dry_run=True, random_split=
         print(f"Error: '{source_folder}' is not a directory")
         return
     
-    # Get all image files
-    image_files = []
-    for file in source.iterdir():
-        if file.is_file() and file.suffix.lower() in image_extensions:
-            image_files.append(file)
-    
-    # Sort files by name
-    image_files.sort(key=lambda x: x.name)
+    # Get all image files, sorted by name
+    # (scandir entries cache the file type, so no extra stat per file)
+    with os.scandir(source) as it:
+        image_files = sorted(
+            (entry for entry in it
+             if entry.is_file() and os.path.splitext(entry.name)[1].lower() in image_extensions),
+            key=lambda entry: entry.name
+        )
     
     if not image_files:
         print(f"No image files found in '{source_folder}'")
@@ -121,13 +131,13 @@ def split_train_test(source_folder, num_test_images, dry_run=True, random_split=
         print("Moving files to train folder...")
         for file in train_files:
             dest = train_folder / file.name
-            shutil.move(str(file), str(dest))
+            move_file(file.path, dest)
         print(f"✓ Moved {len(train_files)} files to train folder")
         
         print("\nMoving files to test folder...")
         for file in test_files:
             dest = test_folder / file.name
-            shutil.move(str(file), str(dest))
+            move_file(file.path, dest)
         print(f"✓ Moved {len(test_files)} files to test folder")
         
         print(f"\n✓ Successfully split {total_images} images!")
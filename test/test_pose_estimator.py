@@ -0,0 +1,52 @@
+"""Tests for PoseEstimator."""
+
+import unittest
+
+import cv2
+import numpy as np
+
+from modules import PoseEstimator
+
+
+def _synthetic_correspondences():
+    """Exact 2D-3D correspondences for a camera at a known position."""
+    rng = np.random.default_rng(0)
+    K = np.array([[640, 0, 320], [0, 640, 240], [0, 0, 1]], dtype=np.float32)
+    points_3d = np.column_stack([
+        rng.uniform(-3, 3, 200),
+        rng.uniform(-2, 2, 200),
+        rng.uniform(4, 10, 200)
+    ]).astype(np.float32)
+    rvec = np.array([0.1, -0.2, 0.05])
+    tvec = np.array([0.3, 0.1, 0.5])
+    points_2d, _ = cv2.projectPoints(points_3d, rvec, tvec, K, None)
+    R, _ = cv2.Rodrigues(rvec)
+    return points_3d, points_2d.reshape(-1, 2).astype(np.float32), K, -R.T @ tvec
+
+
+class TestReadOnlyCameraMatrix(unittest.TestCase):
+    """A read-only K (as shared by MapLoader) must be accepted unchanged."""
+
+    def setUp(self):
+        self.points_3d, self.points_2d, K, self.position = _synthetic_correspondences()
+        self.K = K.copy()
+        self.K.flags.writeable = False
+
+    def check_pose(self, pose):
+        self.assertIsNotNone(pose)
+        np.testing.assert_allclose(pose['position'], self.position, atol=1e-3)
+
+    def test_set_camera_matrix(self):
+        estimator = PoseEstimator(min_inliers=4)
+        estimator.set_camera_matrix(self.K)
+        self.check_pose(estimator.estimate_pose(self.points_3d, self.points_2d))
+        self.assertFalse(self.K.flags.writeable)
+
+    def test_passed_camera_matrix(self):
+        estimator = PoseEstimator(min_inliers=4)
+        self.check_pose(estimator.estimate_pose(self.points_3d, self.points_2d, self.K))
+        self.assertFalse(self.K.flags.writeable)
+
+
+if __name__ == "__main__":
+    unittest.main()
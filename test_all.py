@@ -3,37 +3,12 @@
 Test localisation on all test images and show error distribution.
 """
 
+import os
 import numpy as np
-from scipy.spatial.transform import Rotation
 from modules import MapLoader, Localiser
 from pathlib import Path
 
 
-def load_colmap_ground_truth(images_txt_path):
-    """Load ground truth camera positions from COLMAP images.txt file."""
-    colmap_poses = {}
-    
-    with open(images_txt_path, 'r') as f:
-        for line in f:
-            if line.startswith('#') or line.strip() == '':
-                continue
-            
-            parts = line.strip().split()
-            
-            if len(parts) == 10:
-                qw, qx, qy, qz = float(parts[1]), float(parts[2]), float(parts[3]), float(parts[4])
-                tx, ty, tz = float(parts[5]), float(parts[6]), float(parts[7])
-                img_name = parts[9]
-                
-                R = Rotation.from_quat([qx, qy, qz, qw]).as_matrix()
-                t = np.array([tx, ty, tz])
-                C = -R.T @ t
-                
-                colmap_poses[img_name] = C
-    
-    return colmap_poses
-
-
 def main():
     map_root = 'colmap_database/large_map/'
     
@@ -43,7 +18,7 @@ def main():
     print(f"Loaded {len(xyz_world)} 3D points")
 
     K = MapLoader.load_camera_intrinsics('colmap_database/figure_8_map/figure8/ground_truth_poses.json')
-    gt_positions = load_colmap_ground_truth(map_root + 'project_files_large_map/images.txt')
+    gt_positions = MapLoader.load_colmap_ground_truth(map_root + 'project_files_large_map/images.txt')
     
     # Initialize localiser with best parameters
     localiser = Localiser(xyz_world, map_descriptors, K,
@@ -60,9 +35,12 @@ def main():
     errors = []
     failures = []
     
-    for img_path in test_images:
+    # Images are independent, so localise them on a pool of worker processes
+    outcomes = localiser.localise_batch([str(p) for p in test_images], option='resize',
+                                        num_workers=os.cpu_count())
+    
+    for img_path, (result, error) in zip(test_images, outcomes):
         img_name = img_path.name
-        result, error = localiser.localise(str(img_path), option='resize')
         
         if result and img_name in gt_positions:
             gt = gt_positions[img_name]